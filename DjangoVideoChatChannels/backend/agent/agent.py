@@ -2,43 +2,54 @@
 
 import os
 import re
+import math
+import asyncio
 import json
 import random
-from datetime import datetime
-from typing import List, Dict, TypedDict, Literal
+import functools
+import hashlib
+import itertools
+import string
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, TypedDict, Literal, Iterator, AsyncIterator
 from enum import Enum
 
 
-import spacy
-from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer, util
-import google.generativeai as genai
+import numpy as np
 from rich.console import Console
 
 from langgraph.graph import StateGraph, END
 
+from .ml_models import get_embedder, get_gemini, get_nlp, preconnect_gemini
+
+try:
+    import orjson  # Optional: faster JSON encode/decode
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit  # Optional: compiled similarity kernel
+except ImportError:
+    njit = None
+
 # ==============================================================================
 # 1. SETUP AND CONFIGURATION
 # ==============================================================================
-# --- Load Environment and Models ---
-load_dotenv()
-os.environ["TOKENIZERS_PARALLELISM"] = "false"
+# Environment loading and the model singletons live in `ml_models`; each model is
+# loaded on first use.
 
 # --- Paths ---
 SUMMARY_DIR = "interview_reports"
 os.makedirs(SUMMARY_DIR, exist_ok=True)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(SCRIPT_DIR, "data") # Assumes a 'data' folder next to agent.py
-
-# --- Models & API Setup ---
-try:
-    EMBEDDER = SentenceTransformer("all-mpnet-base-v2")
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-    GEMINI_MODEL = genai.GenerativeModel("gemini-1.5-flash") # Updated model name for clarity
-    NLP = spacy.load("en_core_web_sm")
-except Exception as e:
-    print(f"Error loading a model: {e}. Some features may be disabled.")
-    EMBEDDER, GEMINI_MODEL, NLP = None, None, None
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".cache") # Persistent, safe-to-delete LLM result cache
+JD_SUMMARY_CACHE_PATH = os.path.join(CACHE_DIR, "jd_summaries.json")
 
 console = Console()
 
@@ -46,35 +57,166 @@ console = Console()
 # 2. STATELESS UTILITIES
 # ==============================================================================
 
+@functools.lru_cache(maxsize=32)
+def _read_cached(path: str, mtime_ns: int, size: int) -> str:
+    """Reads and strips a file; mtime and size are part of the cache key so edits on disk are picked up."""
+    return Path(path).read_text(encoding="utf-8").strip()
+
 def read_file(filename: str) -> str:
     """Reads a file. Exposed for use by the Django view."""
     path = os.path.join(DATA_DIR, filename)
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read().strip()
-    console.print(f"[yellow]Warning:[/yellow] Missing file: {path}")
-    return ""
-
-def call_llm(prompt: str, system_prompt: str = "") -> str:
-    """Calls the Generative AI model with a given prompt."""
-    if not GEMINI_MODEL: return "LLM is not available."
     try:
-        full_prompt = f"{system_prompt.strip()}\n\n{prompt.strip()}" if system_prompt else prompt
-        response = GEMINI_MODEL.generate_content(full_prompt)
+        # One stat call answers both "does it exist" and "has it changed".
+        st = os.stat(path)
+    except FileNotFoundError:
+        console.print(f"[yellow]Warning:[/yellow] Missing file: {path}")
+        return ""
+    return _read_cached(path, st.st_mtime_ns, st.st_size)
+
+def embed(texts: list[str]) -> np.ndarray:
+    """Encodes texts into L2-normalized sentence embeddings, one row per text."""
+    return get_embedder().encode(texts)
+
+# Recently embedded texts (questions, retrieval queries) recur across turns and retries.
+EMBED_CACHE_SIZE = 256
+_embed_cache: OrderedDict[str, np.ndarray] = OrderedDict()
+_embed_cache_lock = threading.Lock()
+
+def embed_cached(texts: list[str]) -> np.ndarray:
+    """Like `embed`, but reuses recent per-text embeddings and encodes only the misses, in one batch."""
+    found: Dict[str, np.ndarray] = {}
+    with _embed_cache_lock:
+        for text in texts:
+            if text in _embed_cache:
+                _embed_cache.move_to_end(text)
+                found[text] = _embed_cache[text]
+    misses = list(dict.fromkeys(text for text in texts if text not in found))
+    if misses:
+        found.update(zip(misses, embed(misses)))
+        with _embed_cache_lock:
+            for text in misses:
+                _embed_cache[text] = found[text]
+            while len(_embed_cache) > EMBED_CACHE_SIZE:
+                _embed_cache.popitem(last=False)
+    return np.vstack([found[text] for text in texts])
+
+def _cosine_loop(a: np.ndarray, b: np.ndarray) -> float:
+    s = 0.0
+    na = 0.0
+    nb = 0.0
+    for i in range(a.shape[0]):
+        s += a[i] * b[i]
+        na += a[i] * a[i]
+        nb += b[i] * b[i]
+    return s / (math.sqrt(na) * math.sqrt(nb) + 1e-12)
+
+# With numba the loop is compiled once and cached in __pycache__ across processes;
+# otherwise fall back to the equivalent NumPy expression.
+if njit:
+    cosine_similarity = njit(cache=True, fastmath=True)(_cosine_loop)
+else:
+    def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
+        return float(a @ b) / (float(np.linalg.norm(a)) * float(np.linalg.norm(b)) + 1e-12)
+
+def _call_llm_uncached(prompt: str, system_prompt: str = "", generation_config: Dict | None = None) -> str:
+    """Sends the prompt to the Generative AI model. Errors propagate to the caller."""
+    response = get_gemini(system_prompt).generate_content(prompt, generation_config=generation_config)
+    return response.text.strip()
+
+def _stream_llm(prompt: str, system_prompt: str = "", generation_config: Dict | None = None) -> Iterator[str]:
+    """Yields response text chunk by chunk; the caller may stop iterating early."""
+    model = get_gemini(system_prompt)
+    if not model: return
+    try:
+        response = model.generate_content(prompt, generation_config=generation_config, stream=True)
+        for chunk in response:
+            yield chunk.text
+    except Exception as e:
+        console.print(f"[red]LLM Error:[/red] {e}")
+
+async def _stream_llm_async(prompt: str, system_prompt: str = "", generation_config: Dict | None = None) -> AsyncIterator[str]:
+    """Async variant of `_stream_llm`."""
+    model = get_gemini(system_prompt)
+    if not model: return
+    try:
+        response = await model.generate_content_async(prompt, generation_config=generation_config, stream=True)
+        async for chunk in response:
+            yield chunk.text
+    except Exception as e:
+        console.print(f"[red]LLM Error:[/red] {e}")
+
+def call_llm(
+    prompt: str, system_prompt: str = "",
+    stream: bool = False, generation_config: Dict | None = None,
+) -> str | Iterator[str]:
+    """
+    Calls the Generative AI model with a given prompt.
+
+    `system_prompt` is sent as the model's system instruction rather than prepended
+    to the prompt, so its tokens form a stable prefix across calls. With `stream=True`
+    an iterator of text chunks is returned instead.
+    """
+    if stream:
+        return _stream_llm(prompt, system_prompt, generation_config)
+    if not get_gemini(): return "LLM is not available."
+    try:
+        return _call_llm_uncached(prompt, system_prompt, generation_config)
+    except Exception as e:
+        console.print(f"[red]LLM Error:[/red] {e}")
+        return "There was an error communicating with the language model."
+
+async def call_llm_async(
+    prompt: str, system_prompt: str = "",
+    stream: bool = False, generation_config: Dict | None = None,
+) -> str | AsyncIterator[str]:
+    """Async variant of `call_llm`, so independent LLM calls can run concurrently."""
+    if stream:
+        return _stream_llm_async(prompt, system_prompt, generation_config)
+    model = get_gemini(system_prompt)
+    if not model: return "LLM is not available."
+    try:
+        response = await model.generate_content_async(prompt, generation_config=generation_config)
         return response.text.strip()
     except Exception as e:
         console.print(f"[red]LLM Error:[/red] {e}")
         return "There was an error communicating with the language model."
 
 # --- NEW ROBUST NAME EXTRACTION FUNCTION ---
+# Handles "My name is John Doe", "I'm Jane", "call me Alex", "This is Sam", "Myself Priya", etc.
+# Only the lead-in ignores case: the capture must be title-case in the original text, so
+# "I am ready" or "my name is john and i..." fall through to NER instead of matching.
+# "this is" and "myself" open plenty of ordinary sentences and are only safe because of
+# that: "This is really exciting, I am Priya" skips the first lead-in and finds "Priya".
+_NAME_LEAD_INS = r"my\s+name\s+is|I'm|I\s+am|call\s+me|this\s+is|myself"
+_NAME_PHRASE_RE = re.compile(rf"\b(?i:{_NAME_LEAD_INS})\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\b")
+# After "my name is" or "call me" a name follows even when typed in lowercase ("my name is
+# john"); it runs up to three words, ending early at a word that starts the next clause.
+_NAMED_AS_RE = re.compile(r"\b(?:my\s+name\s+is|call\s+me)\s+([a-z]+(?:\s+[a-z]+){0,2})", re.IGNORECASE)
+_NAME_STOP_WORDS = frozenset({"and", "i", "from", "but", "or", "so", "here", "by", "at", "in", "with", "the", "a"})
+# Any lead-in at all. The others ("i'm ready", "i am priya") are ambiguous in lowercase,
+# so such replies go to the LLM whatever their length.
+_NAME_LEAD_IN_RE = re.compile(rf"\b(?:{_NAME_LEAD_INS})\b", re.IGNORECASE)
+# A reply that is nothing but a short name, e.g. "John Smith" or "O'Neil": one to three
+# capitalized words, so a short sentence like "I am ready" is not mistaken for one.
+_NAME_ONLY_RE = re.compile(r"^[A-Z][A-Za-z'-]+(?:\s+[A-Z][A-Za-z'-]+){0,2}$")
+_NAME_ONLY_MAX_CHARS = 40
+# Below this length the regex and NER passes are reliable enough to skip the LLM.
+_LLM_NAME_MIN_CHARS = 80
+# Caps the user text sent to the LLM to bound input tokens.
+_LLM_NAME_MAX_CHARS = 200
+
 def extract_name(text: str) -> str | None:
     """
     Extracts a person's name from a string using a multi-step approach.
 
-    This function attempts to find a name in the following order:
-    1. spaCy's Named Entity Recognition (NER) to identify 'PERSON' entities.
-    2. A call to the Gemini LLM as a powerful fallback for conversational text.
-    3. Regex patterns for common phrases like "My name is...".
+    This function attempts to find a name in the following order, cheapest first:
+    1. Regex patterns for common phrases like "My name is...", including the
+       lowercase words after "my name is" or "call me".
+    2. A short reply that looks like a bare name.
+    3. spaCy's Named Entity Recognition (NER) to identify 'PERSON' entities,
+       or a short run of capitalized words when NER finds none.
+    4. A call to the Gemini LLM, for longer conversational text or any reply
+       with an introduction phrase the earlier steps could not resolve.
 
     Args:
         text: The input string from the user, potentially containing a name.
@@ -86,86 +228,298 @@ def extract_name(text: str) -> str | None:
     if not text:
         return None
 
-    # Method 1: spaCy Named Entity Recognition (fast and local)
-    if NLP:
-        doc = NLP(text)
+    # Method 1: Regex for simple, common patterns
+    match = _NAME_PHRASE_RE.search(text)
+    if match:
+        return match.group(1).title()
+    match = _NAMED_AS_RE.search(text)
+    if match:
+        words = list(itertools.takewhile(lambda w: w.lower() not in _NAME_STOP_WORDS, match.group(1).split()))
+        if words:
+            return " ".join(words).title()
+
+    # Method 2: the whole string is the name if it looks like one.
+    if len(text) <= _NAME_ONLY_MAX_CHARS and _NAME_ONLY_RE.match(text):
+        return text.title()
+
+    # Method 3: spaCy Named Entity Recognition (fast and local)
+    nlp = get_nlp()
+    if nlp:
+        doc = nlp(text)
         person_ents = [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
         if person_ents:
             full_name = " ".join(person_ents)
             return " ".join([name.capitalize() for name in full_name.split()])
-
-    # Method 2: LLM as a powerful fallback
-    if GEMINI_MODEL:
+        # NER often misses bare names; 1-3 capitalized alphabetic words are a name
+        # with high confidence, so don't pay for an LLM round-trip on them.
+        toks = [t for t in doc if not t.is_space and not t.is_punct]
+        if 1 <= len(toks) <= 3 and all(t.is_alpha and t.is_title for t in toks):
+            return " ".join(t.text for t in toks).title()
+
+    # Method 4: LLM as a powerful fallback for long, conversational replies
+    if get_gemini() and (len(text) > _LLM_NAME_MIN_CHARS or _NAME_LEAD_IN_RE.search(text)):
         prompt = (
             "You are a highly accurate name extraction system. "
             f"From the following text, extract only the person's full name. "
             "Do not add any explanation or preamble. If no name is present, respond with the exact word 'NONE'.\n\n"
-            f"Text: \"{text}\""
+            f"Text: \"{text[:_LLM_NAME_MAX_CHARS]}\""
         )
         llm_response = call_llm(prompt).strip()
         if llm_response.upper() != 'NONE' and len(llm_response) > 2:
              return llm_response.title()
 
-    # Method 3: Regex for simple, common patterns
-    # Handles "My name is John Doe", "I'm Jane", "call me Alex", etc.
-    match = re.search(r"(?:my\s+name\s+is|I'm|I\s+am|call\s+me)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)", text, re.IGNORECASE)
-    if match:
-        return match.group(1).title()
-
-    # If no pattern matches, assume the whole string might be the name if it looks like one.
-    if len(text.split()) <= 3 and re.match(r"^[A-Za-z\s'-]+$", text):
-        return text.title()
-        
     return None
 
+# --- Resume Retrieval ---
+# Resumes are split into bullets/paragraphs once per session; each question prompt then
+# carries only the few chunks most relevant to the conversation instead of the full text.
+_RESUME_SPLIT_RE = re.compile(r"\n[-•*]\s*|\n{2,}")
+RESUME_TOP_K = 3
+
+def split_resume(resume: str) -> List[str]:
+    """Splits a resume into bullet/paragraph chunks."""
+    return [chunk.strip() for chunk in _RESUME_SPLIT_RE.split(resume) if chunk.strip()]
+
+@functools.lru_cache(maxsize=32)
+def _embed_resume_chunks(chunks: tuple[str, ...]) -> np.ndarray:
+    """Embeds a session's resume chunks once; later turns of the same interview hit the cache."""
+    return np.vstack([embed(list(chunks[i:i + 32])) for i in range(0, len(chunks), 32)])
+
+def retrieve_resume_chunks(chunks: List[str], query: str, k: int = RESUME_TOP_K) -> List[str]:
+    """Returns the `k` resume chunks most similar to `query`, in resume order."""
+    if len(chunks) <= k or not get_embedder():
+        return chunks[:k]
+    scores = _embed_resume_chunks(tuple(chunks)) @ embed_cached([query])[0]
+    top = np.argpartition(-scores, k)[:k]
+    return [chunks[i] for i in sorted(top)]
+
+# Maps every ASCII character outside [A-Za-z0-9_] to "_" for report file names.
+_SAFE_NAME_CHARS = set(string.ascii_letters + string.digits + "_")
+_SAFE_NAME_TRANS = str.maketrans({c: "_" for c in map(chr, range(128)) if c not in _SAFE_NAME_CHARS})
+
+# --- Job Description Summary ---
+# The summary is a pure function of the JD text, so it is computed once per JD and shared
+# across sessions, and across worker processes and restarts via a small JSON file.
+def _load_jd_summaries() -> Dict[str, str]:
+    try:
+        return json.loads(Path(JD_SUMMARY_CACHE_PATH).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+# Serializes this process's read-modify-write of the summary file.
+_jd_summary_lock = threading.Lock()
+
+def _store_jd_summary(key: str, summary: str):
+    """Persists a summary for later processes. Best effort: failures are reported, not raised."""
+    try:
+        with _jd_summary_lock:
+            _write_jd_summary(key, summary)
+    except OSError as e:
+        console.print(f"[yellow]Warning:[/yellow] Could not persist the JD summary: {e}")
+
+def _write_jd_summary(key: str, summary: str):
+    summaries = _load_jd_summaries()
+    summaries[key] = summary
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # A unique temp file per write, so writers in other processes never share one.
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(summaries, f)
+        os.replace(tmp_path, JD_SUMMARY_CACHE_PATH)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+@functools.lru_cache(maxsize=64)
+def _summarize_job_description_cached(jd_text: str) -> str:
+    """Returns the JD summary from disk or Gemini. Raises on LLM errors, so failures aren't cached."""
+    key = hashlib.sha256(jd_text.encode("utf-8")).hexdigest()
+    summary = _load_jd_summaries().get(key)
+    if summary is None:
+        summary = _call_llm_uncached(f"Summarize this job description in one friendly sentence for a candidate:\n{jd_text}")
+        _store_jd_summary(key, summary)
+    return summary
+
+def summarize_job_description(jd_text: str) -> str:
+    """One friendly sentence describing the role, or "" if it cannot be generated."""
+    if not jd_text or not get_gemini():
+        return ""
+    try:
+        return _summarize_job_description_cached(jd_text)
+    except Exception as e:
+        console.print(f"[red]LLM Error:[/red] {e}")
+        return ""
+
 def save_summary_as_json(name: str, logs: List[Dict]):
     """Saves the interview log to a JSON file."""
-    safe_name = re.sub(r'[^a-zA-Z0-9_]', '_', name.strip()).lower() or "unknown_candidate"
-    timestamp = datetime.now().strftime('%Y-%m-%dT%H-%M-%S')
+    # Non-ASCII characters become "?" first, so they are replaced like any other symbol.
+    ascii_name = name.strip().encode("ascii", "replace").decode("ascii")
+    safe_name = ascii_name.translate(_SAFE_NAME_TRANS)[:64].lower() or "unknown_candidate"
+    timestamp = time.strftime('%Y-%m-%dT%H-%M-%S', time.localtime())
     path = os.path.join(SUMMARY_DIR, f"{safe_name}_{timestamp}.json")
     summary_data = {
         "candidateName": name,
         "interviewTimestamp": timestamp,
         "conversationLog": logs
     }
-    with open(path, "w", encoding='utf-8') as f:
-        json.dump(summary_data, f, indent=4)
+    # Serialize once and write the whole document in one call; `json.dump` would
+    # instead push every token through the file object separately.
+    if orjson:
+        data = orjson.dumps(summary_data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    else:
+        data = json.dumps(summary_data, indent=4).encode("utf-8")
+    Path(path).write_bytes(data)
     console.print(f"\n[green]Interview summary saved to {path}[/green]")
 
 # ==============================================================================
 # 3. AGENT TOOLS (Re-usable Components)
 # ==============================================================================
 
+RECENT_QUESTIONS_IN_PROMPT = 5
+MAX_REPEAT_RETRIES = 2
+
+# --- Speculative Question Prefetch ---
+# While the candidate answers question N, question N+1 is generated in the background.
+# The next prompt depends only on the session context and the asked questions, so it is
+# known in advance; futures are keyed by that prompt and consumed by `generate`.
+_LLM_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm-prefetch")
+MAX_PREFETCH_IN_FLIGHT = 4   # never queue more Gemini calls than the pool runs at once
+MAX_PREFETCHED = 64          # bounds results left behind by abandoned interviews
+# Transitions are meant to vary, so they are not cached as one response. The first few
+# generated phrases are kept instead, and once there are enough, one is picked at random.
+TRANSITION_POOL_SIZE = 8
+_prefetched: OrderedDict[str, Future] = OrderedDict()
+_prefetch_lock = threading.Lock()
+
 class QuestionGenerator:
     """Generates main and transitional questions."""
     def __init__(self):
         self.system_prompt = "You are a friendly and professional AI interviewer."
-
-    def generate(self, state: Dict) -> str:
-        prompt = (
+        self.fallback_question = "Could you tell me about your most relevant experience?"
+        self.transition_prompt = " Generate a short, professional transition phrase (under 8 words) like 'Alright, thank you.' or 'Okay, moving on.' to proceed to the next question. The phrase must be polite and concise. "
+        self.transition_fallback = ["Got it.", "That makes sense."]
+        self._transitions: List[str] = []
+
+    def _context(self, state: Dict) -> str:
+        """Job/resume context for the prompt: the JD summary plus the top resume chunks when available."""
+        jd_summary, chunks = state.get('jd_summary'), state.get('resume_chunks')
+        if not jd_summary or not chunks:
+            return (
+                f"Job Description: {state.get('job_description', 'N/A')}\n"
+                f"Resume: {state.get('resume', 'N/A')}\n"
+            )
+        query = " ".join(state.get('asked_questions', [])[-2:]) or jd_summary
+        bullets = "\n".join(f"- {chunk}" for chunk in retrieve_resume_chunks(chunks, query))
+        return f"Job Summary: {jd_summary}\nRelevant Resume Highlights:\n{bullets}\n"
+
+    def _build_prompt(self, state: Dict) -> str:
+        # Only the most recent questions go into the prompt, so its size stays constant
+        # however long the interview runs; exact repeats are caught by the caller.
+        recent = state.get('asked_questions', [])[-RECENT_QUESTIONS_IN_PROMPT:]
+        return (
             "Generate one concise, role-specific interview question based on the provided job description and resume.\n"
-            f"Avoid asking questions similar to these already asked: {', '.join(state.get('asked_questions', [])) or 'None'}\n"
-            f"Job Description: {state.get('job_description', 'N/A')}\n"
-            f"Resume: {state.get('resume', 'N/A')}\n"
+            f"Avoid asking questions similar to these already asked: {', '.join(recent) or 'None'}\n"
+            f"{self._context(state)}"
             "Output only the question text, without any preamble."
         )
-        return (call_llm(prompt, self.system_prompt) or "Could you tell me about your most relevant experience?").strip()
+
+    def generate(self, state: Dict) -> str:
+        prompt = self._build_prompt(state)
+        with _prefetch_lock:
+            future = _prefetched.pop(prompt, None)
+        # A prefetch still in flight started earlier than a fresh call would, so wait for it.
+        response = future.result() if future else call_llm(prompt, self.system_prompt)
+        return (response or self.fallback_question).strip()
+
+    async def generate_async(self, state: Dict) -> str:
+        """Async variant of `generate`; waiting on the LLM or a prefetch never blocks the loop."""
+        # Building the prompt may embed the retrieval query, which is CPU work.
+        prompt = await asyncio.to_thread(self._build_prompt, state)
+        with _prefetch_lock:
+            future = _prefetched.pop(prompt, None)
+        if future:
+            response = await asyncio.wrap_future(future)
+        else:
+            response = await call_llm_async(prompt, self.system_prompt)
+        return (response or self.fallback_question).strip()
+
+    def prefetch(self, state: Dict):
+        """Starts generating the question for `state` in the background, if there is capacity."""
+        prompt = self._build_prompt(state)
+        with _prefetch_lock:
+            in_flight = sum(1 for f in _prefetched.values() if not f.done())
+            if prompt in _prefetched or in_flight >= MAX_PREFETCH_IN_FLIGHT:
+                return
+            _prefetched[prompt] = _LLM_POOL.submit(call_llm, prompt, self.system_prompt)
+            while len(_prefetched) > MAX_PREFETCHED:
+                _prefetched.popitem(last=False)
+
+    def _pooled_transition(self, response: str) -> str:
+        # Failed calls are neither pooled nor shown; a fallback phrase is used instead.
+        response = response.strip()
+        if not response:
+            return random.choice(self.transition_fallback)
+        if len(self._transitions) < TRANSITION_POOL_SIZE:
+            self._transitions.append(response)
+        return response
 
     def transition(self) -> str:
-        fallback = [ "Got it.", "That makes sense."]
-        prompt = " Generate a short, professional transition phrase (under 8 words) like 'Alright, thank you.' or 'Okay, moving on.' to proceed to the next question. The phrase must be polite and concise. "
-        return (call_llm(prompt, self.system_prompt) or random.choice(fallback)).strip()
+        if len(self._transitions) >= TRANSITION_POOL_SIZE:
+            return random.choice(self._transitions)
+        try:
+            response = _call_llm_uncached(self.transition_prompt, self.system_prompt) if get_gemini() else ""
+        except Exception as e:
+            console.print(f"[red]LLM Error:[/red] {e}")
+            response = ""
+        return self._pooled_transition(response)
+
+    async def transition_async(self) -> str:
+        if len(self._transitions) >= TRANSITION_POOL_SIZE:
+            return random.choice(self._transitions)
+        model = get_gemini(self.system_prompt)
+        try:
+            response = (await model.generate_content_async(self.transition_prompt)).text if model else ""
+        except Exception as e:
+            console.print(f"[red]LLM Error:[/red] {e}")
+            response = ""
+        return self._pooled_transition(response)
 
 class FollowUpGenerator:
     """Generates a follow-up question if an answer lacks detail."""
     def __init__(self):
         self.system_prompt = "You are an expert interviewer. Your job is to analyze a candidate's answer and ask one, probing follow-up question to gain more clarity. If the answer is sufficiently detailed, respond with only the exact text 'NO_FOLLOWUP'."
+        # Follow-ups are a single sentence; the response is streamed and cut off early.
+        self.generation_config = {"max_output_tokens": 64}
+        self.max_chars = 300
 
-    def generate(self, question: str, answer: str) -> str:
-        prompt = f"Original Question: \"{question}\"\nCandidate's Answer: \"{answer}\"\n\nBased on the answer, what is one concise follow-up question? If none is needed, just say 'NO_FOLLOWUP'."
-        follow_up = call_llm(prompt, self.system_prompt)
+    def _build_prompt(self, question: str, answer: str) -> str:
+        return f"Original Question: \"{question}\"\nCandidate's Answer: \"{answer}\"\n\nBased on the answer, what is one concise follow-up question? If none is needed, just say 'NO_FOLLOWUP'."
+
+    def _parse(self, follow_up: str) -> str:
         return "NO_FOLLOWUP" if "NO_FOLLOWUP" in follow_up or len(follow_up) < 10 else follow_up.strip()
 
+    def generate(self, question: str, answer: str) -> str:
+        buf = ""
+        for chunk in call_llm(self._build_prompt(question, answer), self.system_prompt, stream=True, generation_config=self.generation_config):
+            buf += chunk
+            if "NO_FOLLOWUP" in buf:
+                return "NO_FOLLOWUP"
+            if len(buf) > self.max_chars:
+                break
+        return self._parse(buf)
+
+    async def generate_async(self, question: str, answer: str) -> str:
+        buf = ""
+        chunks = await call_llm_async(self._build_prompt(question, answer), self.system_prompt, stream=True, generation_config=self.generation_config)
+        async for chunk in chunks:
+            buf += chunk
+            if "NO_FOLLOWUP" in buf:
+                return "NO_FOLLOWUP"
+            if len(buf) > self.max_chars:
+                break
+        return self._parse(buf)
+
 # evaluater agent 
 class Evaluator:
     """Human-like evaluator with weighted scoring for answers."""
@@ -178,6 +532,9 @@ class Evaluator:
             "completeness": 0.1,
             "communication": 0.1,
         }
+        # Fixed criterion order so scoring is a single dot product.
+        self._criteria_keys = tuple(self.criteria_weights)
+        self._criteria_w = np.fromiter(self.criteria_weights.values(), dtype=np.float32)
 
         self.system_prompt = (
             "You are an expert recruiter with Technical Knowledge.  "
@@ -188,26 +545,43 @@ class Evaluator:
             "\"clarity\": 7, \"relevance\": 9, \"depth\": 6, \"completeness\": 8, "
             "\"communication\": 7, \"feedback\": \"Good structure, but more detail needed.\"}"
         )
+        # Constrained decoding: Gemini returns a bare JSON object matching this schema, so the
+        # fast single-parse path in `_extract_json` hits and the embedding fallback is rare.
+        self.generation_config = {
+            "response_mime_type": "application/json",
+            "response_schema": {
+                "type": "object",
+                "properties": {
+                    **{k: {"type": "integer"} for k in self._criteria_keys},
+                    "feedback": {"type": "string"},
+                },
+                "required": [*self._criteria_keys, "feedback"],
+            },
+        }
+        self._json_decoder = json.JSONDecoder()
 
     def _extract_json(self, text: str) -> dict:
-        match = re.search(r'```json\s*([\s\S]+?)\s*```', text)
-        text_to_load = match.group(1) if match else text
+        """Decodes the first JSON object in the response, fenced (```json) or bare."""
+        if "```json" in text:
+            text = text.split("```json", 1)[-1].split("```", 1)[0]
+        start = text.find("{")
+        if start < 0:
+            return {}
+        if orjson:
+            # Common case: the (unfenced) response is exactly one JSON object.
+            try:
+                obj = orjson.loads(text[start:].rstrip())
+                return obj if isinstance(obj, dict) else {}
+            except orjson.JSONDecodeError:
+                pass
         try:
-            return json.loads(text_to_load)
+            obj, _ = self._json_decoder.raw_decode(text, start)
         except json.JSONDecodeError:
             return {}
+        return obj if isinstance(obj, dict) else {}
 
-    def _normalize_score(self, score: float) -> float:
-        """Clamp score to [1, 10]."""
-        if not isinstance(score, (int, float)):
-            return 0.0
-        return max(1.0, min(10.0, float(score)))
-
-    def evaluate(self, question: str, answer: str) -> tuple[float, str]:
-        if not answer.strip():
-            return 1.0, "No answer provided."
-
-        prompt = (
+    def _build_prompt(self, question: str, answer: str) -> str:
+        return (
             f"Evaluate the candidate's response.\n\n"
             f"Question: {question}\n"
             f"Answer: {answer}\n\n"
@@ -215,24 +589,26 @@ class Evaluator:
             "and a short constructive 'feedback'."
         )
 
-        # Call LLM
-        result = self._extract_json(call_llm(prompt, self.system_prompt))
+    def _score(self, question: str, answer: str, llm_response: str) -> tuple[float, str]:
+        """Turns the raw LLM evaluation into a weighted score and feedback string."""
+        result = self._extract_json(llm_response)
 
-        # Weighted scoring
-        total_score = 0.0
-        for criterion, weight in self.criteria_weights.items():
-            total_score += weight * self._normalize_score(result.get(criterion, 0))
+        # Weighted scoring, with each criterion clamped to [1, 10]
+        scores = np.fromiter(
+            (v if isinstance(v := result.get(k, 0), (int, float)) else 0 for k in self._criteria_keys),
+            dtype=np.float32, count=len(self._criteria_keys),
+        )
+        np.clip(scores, 1.0, 10.0, out=scores)
+        total_score = float(self._criteria_w @ scores)
 
         feedback = result.get("feedback", "").strip()
 
         # Fallback if LLM fails
         if total_score <= 1 or not feedback:
-            if EMBEDDER:
-                similarity = util.pytorch_cos_sim(
-                    EMBEDDER.encode(question),
-                    EMBEDDER.encode(answer)
-                ).item()
-                total_score = round(similarity * 10, 1)
+            if get_embedder():
+                # Both texts go through one batched forward pass (fewer if already cached).
+                q_emb, a_emb = embed_cached([question, answer])
+                total_score = round(float(cosine_similarity(q_emb, a_emb)) * 10, 1)
                 feedback = (
                     "The response has some relevance but lacks depth or clarity. "
                     "Provide more structured and detailed points."
@@ -243,6 +619,23 @@ class Evaluator:
 
         return round(total_score, 1), feedback
 
+    def evaluate(self, question: str, answer: str) -> tuple[float, str]:
+        if not answer.strip():
+            return 1.0, "No answer provided."
+        llm_response = call_llm(
+            self._build_prompt(question, answer), self.system_prompt, generation_config=self.generation_config
+        )
+        return self._score(question, answer, llm_response)
+
+    async def evaluate_async(self, question: str, answer: str) -> tuple[float, str]:
+        if not answer.strip():
+            return 1.0, "No answer provided."
+        llm_response = await call_llm_async(
+            self._build_prompt(question, answer), self.system_prompt, generation_config=self.generation_config
+        )
+        # The similarity fallback runs the embedder (and may wait for it to load); keep it off the loop.
+        return await asyncio.to_thread(self._score, question, answer, llm_response)
+
 
 # Instantiate tools once to be used by the agent nodes
 evaluator_tool = Evaluator()
@@ -266,6 +659,10 @@ class InterviewState(TypedDict):
     asked_questions: List[str]
     interview_logs: List[Dict]
 
+    # --- Session Context (computed once at name capture) ---
+    jd_summary: str
+    resume_chunks: List[str]
+
     # --- Output for the Client (populated by graph nodes) ---
     reply_to_user: str
     question_for_user: str
@@ -299,30 +696,55 @@ def capture_name_node(state: InterviewState) -> Dict:
     # Fallback logic: if extraction fails, use the original input, otherwise default to "Candidate"
     name = extracted_name or user_response.title().strip() or "Candidate"
     
-    jd_summary = call_llm(f"Summarize this job description in one friendly sentence for a candidate named {name}:\n{state['job_description']}")
-    
+    jd_summary = summarize_job_description(state["job_description"])
+
+    # Chunk and embed the resume now so question prompts can carry only the relevant parts.
+    resume_chunks = split_resume(state.get("resume", ""))
+    if get_embedder() and resume_chunks:
+        _embed_resume_chunks(tuple(resume_chunks))
+
     return {
         "candidate_name": name,
-        "reply_to_user": f"It's a pleasure to meet you, {name}! {jd_summary}",
+        "jd_summary": jd_summary,
+        "resume_chunks": resume_chunks,
+        "reply_to_user": f"It's a pleasure to meet you, {name}! {jd_summary}".strip(),
         "question_for_user": "Are you ready to begin?",
         "current_stage": "start_confirmation"
     }
 
-def ask_main_question_node(state: InterviewState) -> Dict:
+async def ask_main_question_node(state: InterviewState) -> Dict:
     """Generates and asks a new primary interview question."""
-    reply = question_gen_tool.transition() if state.get('asked_questions') else "Great! Let's dive right in."
-    question = question_gen_tool.generate(state)
-        
+    asked = state.get('asked_questions', [])
+    if asked:
+        # The transition phrase and the question are independent LLM calls.
+        reply, question = await asyncio.gather(
+            question_gen_tool.transition_async(), question_gen_tool.generate_async(state)
+        )
+    else:
+        reply, question = "Great! Let's dive right in.", await question_gen_tool.generate_async(state)
+    # The prompt only lists recent questions, so guard against repeating an older one.
+    # A retry sends the identical prompt (the prefetched result was consumed above) and
+    # relies on sampling to differ, so it is bounded; a last repeat is asked as is.
+    for _ in range(MAX_REPEAT_RETRIES):
+        if question not in asked:
+            break
+        question = await question_gen_tool.generate_async(state)
+
+    asked_questions = asked + [question]
+    if len(asked_questions) < state.get("num_questions_total", 5):
+        # Building the prompt embeds the retrieval query; keep that off the event loop.
+        await asyncio.to_thread(question_gen_tool.prefetch, {**state, "asked_questions": asked_questions})
+
     return {
         "reply_to_user": reply,
         "question_for_user": question,
         "current_stage": "awaiting_answer",
         "_last_question_asked": question,
-        "asked_questions": state.get('asked_questions', []) + [question],
+        "asked_questions": asked_questions,
         "_is_follow_up_turn": False,
     }
 
-def process_answer_node(state: InterviewState) -> Dict:
+async def process_answer_node(state: InterviewState) -> Dict:
     """Processes the user's answer: evaluates it, logs it, and checks for a follow-up."""
     last_q = state["_last_question_asked"]
     user_answer = state["user_input"].strip()
@@ -344,10 +766,18 @@ def process_answer_node(state: InterviewState) -> Dict:
             "_is_follow_up_turn": state.get("_is_follow_up_turn", False)
         }
 
-    # Existing logic
-    score, feedback = evaluator_tool.evaluate(last_q, user_answer)
+    if state.get("_is_follow_up_turn"):
+        # After a follow-up answer the router always moves on, so a follow-up check would be
+        # discarded; the next main question has been prefetching since the last main ask.
+        score, feedback = await evaluator_tool.evaluate_async(last_q, user_answer)
+        follow_up_q = "NO_FOLLOWUP"
+    else:
+        # Scoring and the follow-up check are independent, so run both LLM calls concurrently.
+        (score, feedback), follow_up_q = await asyncio.gather(
+            evaluator_tool.evaluate_async(last_q, user_answer),
+            follow_up_tool.generate_async(last_q, user_answer),
+        )
     new_log = {"question": last_q, "answer": user_answer, "evaluation": {"score": score, "feedback": feedback}}
-    follow_up_q = follow_up_tool.generate(last_q, user_answer)
     
     return {
         "interview_logs": state.get("interview_logs", []) + [new_log],
@@ -386,6 +816,9 @@ class RoutingDecision(Enum):
     ASK_MAIN_QUESTION = "ask_main_question"
     CONCLUDE = "conclude"
 
+# Affirmative replies to "Are you ready to begin?"; word boundaries keep "okra" from matching "ok".
+_READY_RE = re.compile(r"\b(?:yes|ready|ok(?:ay)?|sure|fine|yep|yeah|let'?s go)\b", re.I)
+
 def route_by_stage(state: InterviewState) -> str:
     """Entry point router that directs the graph based on the interview's current stage."""
     stage = state.get("current_stage")
@@ -395,8 +828,7 @@ def route_by_stage(state: InterviewState) -> str:
     if stage == "name_capture":
         return "capture_name"
     if stage == "start_confirmation":
-        user_intent = state.get("user_input", "").lower()
-        if any(word in user_intent for word in ["yes", "ready", "ok", "sure", "fine"]):
+        if _READY_RE.search(state.get("user_input", "")):
             return "ask_main_question"
         return "conclusion" # If user isn't ready, end gracefully
     if stage == "awaiting_answer":
@@ -475,11 +907,77 @@ class AgenticInterviewSystem:
         
         return workflow.compile()
 
-    def invoke(self, current_state: Dict) -> Dict:
-        # ... (no changes to this function)
+    def _prepare(self, current_state: Dict) -> Dict:
         current_state['reply_to_user'] = ""
         current_state['question_for_user'] = ""
         # Initialize the new flag if it's not present
         if "_is_follow_up_turn" not in current_state:
             current_state["_is_follow_up_turn"] = False
-        return self.app.invoke(current_state)
\ No newline at end of file
+        return current_state
+
+    async def ainvoke(self, current_state: Dict) -> Dict:
+        """Runs one interview turn. `process_answer` is an async node, so this is the primary entry point."""
+        return await self.app.ainvoke(self._prepare(current_state))
+
+    async def astream(self, current_state: Dict) -> AsyncIterator[tuple[Dict, Dict]]:
+        """
+        Runs one interview turn like `ainvoke`, yielding `(update, state)` after each node:
+        that node's own update and the state so far. The last `state` is the turn's result,
+        so callers can forward early output (e.g. a reply) before the turn finishes.
+        """
+        state = self._prepare(current_state)
+        async for step in self.app.astream(state, stream_mode="updates"):
+            for update in step.values():
+                update = update or {}
+                state = {**state, **update}
+                yield update, state
+
+    def invoke(self, current_state: Dict) -> Dict:
+        """Synchronous wrapper around `ainvoke` for callers without a running event loop."""
+        return asyncio.run(self.ainvoke(current_state))
+
+# --- Shared Instance ---
+# Built on first use rather than when the views are imported, so processes that never
+# serve a turn (e.g. management commands) don't pay for it; `warm_up` builds it early.
+_agent_system: AgenticInterviewSystem | None = None
+_agent_lock = threading.Lock()
+
+def get_agent_system() -> AgenticInterviewSystem:
+    """Returns the process-wide agent, building it on the first call."""
+    global _agent_system
+    if _agent_system is None:
+        with _agent_lock:
+            if _agent_system is None:
+                _agent_system = AgenticInterviewSystem()
+    return _agent_system
+
+# The bundled JD and resume the interview page always interviews against.
+DEMO_JD_FILE = "software_engineer_jd.txt"
+DEMO_RESUME_FILE = "candidate_resume.txt"
+_demo_documents: tuple[str, str] | None = None
+
+def demo_documents() -> tuple[str, str] | None:
+    """The bundled (JD, resume) once `load_demo_documents` has read them, else None."""
+    return _demo_documents
+
+def load_demo_documents() -> tuple[str, str]:
+    """
+    Reads the bundled JD and resume into memory for the rest of the process, so new
+    interviews on the page start without touching the disk. Restart the server to
+    pick up edits to them.
+    """
+    global _demo_documents
+    if _demo_documents is None:
+        _demo_documents = (read_file(DEMO_JD_FILE), read_file(DEMO_RESUME_FILE))
+    return _demo_documents
+
+def warm_up():
+    """
+    Builds the agent, loads every model, reads the demo documents and opens the Gemini
+    channel, so the first interview turn doesn't wait for any of them.
+    """
+    get_agent_system()
+    load_demo_documents()
+    get_nlp()
+    get_embedder()
+    preconnect_gemini()
\ No newline at end of file
@@ -1,6 +1,42 @@
+import os
+import sys
+import threading
+
 from django.apps import AppConfig
 
 
+# Each server imports one of these before it loads the Django application.
+_SERVER_MODULES = ("daphne.server", "gunicorn.arbiter", "uvicorn.server", "hypercorn.config")
+
+
+def _serves_requests() -> bool:
+    """
+    True in a process that will serve requests. Anything else (`manage.py migrate`,
+    tests, celery, a shell or script calling `django.setup()`) skips the warmup,
+    which loads every model and contacts Gemini. AGENT_WARMUP=1 or 0 overrides this.
+    """
+    override = os.getenv("AGENT_WARMUP")
+    if override is not None:
+        return override == "1"
+    if os.path.basename(sys.argv[0]) in ("manage.py", "django-admin"):
+        if sys.argv[1:2] != ["runserver"]:
+            return False
+        # Under the autoreloader only the child process (RUN_MAIN=true) serves requests.
+        return os.getenv("RUN_MAIN") == "true" or "--noreload" in sys.argv
+    return any(name in sys.modules for name in _SERVER_MODULES)
+
+
 class AgentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'agent'
+
+    def ready(self):
+        # Build the agent and load its models in the background as soon as a server
+        # starts, so the first interview turn doesn't wait on them.
+        if _serves_requests():
+            threading.Thread(target=self._warm_up, name="agent-warmup", daemon=True).start()
+
+    @staticmethod
+    def _warm_up():
+        from .agent import warm_up
+        warm_up()
@@ -0,0 +1,151 @@
+# agent/json_utils.py
+"""
+JSON helpers for the interview turn views, consumers and session store.
+
+orjson parses and serializes several times faster than the stdlib encoder behind
+JsonResponse, which matters because every turn decodes a request and encodes the
+agent's state. It is optional; without it these fall back to the stdlib.
+
+Where `msgpack` is installed, the agent API also speaks it: a request sent as
+application/msgpack is decoded as such, and a client that accepts it gets its
+response packed. JSON stays the default, so the endpoint can still be driven by hand.
+"""
+
+import json
+from functools import wraps
+
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+
+# Turn requests are a session id and one utterance; anything near this is not a real client.
+MAX_BODY = 1 << 20
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK = "application/msgpack"
+
+# Non-string keys and NumPy values (e.g. scores or embeddings a node leaves in the state)
+# are serialized natively instead of failing or needing a conversion pass first.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z if orjson else 0
+
+
+def declared_too_large(request) -> bool:
+    """True if the request's Content-Length already exceeds MAX_BODY, before the body is read."""
+    try:
+        return int(request.META.get("CONTENT_LENGTH") or 0) > MAX_BODY
+    except ValueError:
+        return False
+
+
+def loads(body: bytes):
+    """Decodes a request body. Errors are `json.JSONDecodeError` (orjson's subclasses it)."""
+    return orjson.loads(body) if orjson else json.loads(body)
+
+
+def dumps(data) -> bytes:
+    """Encodes `data` as compact JSON bytes, e.g. one line of an NDJSON stream."""
+    return orjson.dumps(data, option=ORJSON_OPTIONS) if orjson else json.dumps(data, separators=(",", ":")).encode()
+
+
+def _msgpack_default(obj):
+    # NumPy arrays and scalars, the msgpack counterpart of OPT_SERIALIZE_NUMPY.
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+def packb(data) -> bytes:
+    """Encodes `data` as msgpack bytes (requires `msgpack`)."""
+    return msgpack.packb(data, use_bin_type=True, default=_msgpack_default)
+
+
+def unpackb(body: bytes):
+    """
+    Decodes msgpack bytes. Malformed input raises `json.JSONDecodeError`, so callers
+    (and `JsonErrorMiddleware`) treat it exactly like malformed JSON.
+    """
+    try:
+        return msgpack.unpackb(body, raw=False)
+    except ValueError as e:  # ExtraData, FormatError and truncated input are all ValueErrors
+        raise json.JSONDecodeError(f"Invalid msgpack: {e}", "", 0) from e
+
+
+def decode_body(request, body: bytes):
+    """Decodes a request body as msgpack if it was sent as such, otherwise as JSON."""
+    if msgpack and request.content_type == MSGPACK:
+        return unpackb(body)
+    return loads(body)
+
+
+def response_media_type(request) -> str:
+    """The media type `negotiated_response` will answer `request` with."""
+    if msgpack and MSGPACK in request.headers.get("Accept", ""):
+        return MSGPACK
+    return "application/json"
+
+
+def negotiated_response(request, data, status: int = 200) -> HttpResponse:
+    """`json_response`, or a msgpack response if the client's Accept header asks for one."""
+    if response_media_type(request) == MSGPACK:
+        return HttpResponse(packb(data), content_type=MSGPACK, status=status)
+    return json_response(data, status=status)
+
+
+def json_response(data, status: int = 200) -> HttpResponse:
+    """Drop-in for `JsonResponse(data, status=...)`."""
+    if orjson:
+        return HttpResponse(orjson.dumps(data, option=ORJSON_OPTIONS), content_type="application/json", status=status)
+    return JsonResponse(data, status=status)
+
+
+def error_response(body: bytes, status: int) -> HttpResponse:
+    """Returns one of the pre-encoded `ERR_*` bodies below, without running the encoder."""
+    return HttpResponse(body, content_type="application/json", status=status)
+
+
+# Constant error bodies, encoded once at import.
+ERR_BAD_JSON = dumps({"error": "Invalid JSON in request body."})
+ERR_NO_SESSION = dumps({"error": "Unknown or expired interview session."})
+ERR_INTERNAL = dumps({"error": "An internal server error occurred."})
+ERR_EMPTY_BODY = dumps({"error": "Empty request body."})
+ERR_TOO_LARGE = dumps({"error": "Payload too large."})
+ERR_BAD_METHOD = dumps({"error": "Only POST is allowed."})
+
+
+def json_post(view):
+    """
+    Decorator for the async turn views: CSRF exemption, the POST check and the body
+    checks in one wrapper, calling `view(request, data)` with the decoded body.
+
+    Cheap checks come first, since neither an empty nor an oversized body is worth
+    parsing; the Content-Length check rejects a declared-oversized upload without
+    copying it into memory. Malformed bodies raise `json.JSONDecodeError`, which
+    `JsonErrorMiddleware` turns into a 400.
+    """
+    @csrf_exempt
+    @wraps(view)
+    async def inner(request):
+        if request.method != "POST":
+            response = error_response(ERR_BAD_METHOD, status=405)
+            response["Allow"] = "POST"
+            return response
+        if declared_too_large(request):
+            return error_response(ERR_TOO_LARGE, status=413)
+        # Read once; with csrf_exempt nothing else touches the body, so no form parsing runs.
+        body = request.body
+        if not body:
+            return error_response(ERR_EMPTY_BODY, status=400)
+        if len(body) > MAX_BODY:
+            return error_response(ERR_TOO_LARGE, status=413)
+        return await view(request, decode_body(request, body))
+    # Marks the view for `JsonErrorMiddleware`.
+    inner.json_errors = True
+    return inner
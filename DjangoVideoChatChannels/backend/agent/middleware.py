@@ -0,0 +1,38 @@
+# agent/middleware.py
+"""
+Error handling for the JSON turn views, kept out of the views themselves.
+
+`process_exception` only runs when a view raises, so a successful turn goes through
+a straight-line view with no try/except at all, and the error bodies are pre-encoded.
+It applies to views wrapped in `json_utils.json_post`, whatever the request's
+Content-Type, so a malformed body sent as a form still gets a JSON 400.
+"""
+
+import json
+import logging
+
+from django.utils.deprecation import MiddlewareMixin
+
+from .json_utils import ERR_BAD_JSON, ERR_INTERNAL, error_response, json_response
+
+logger = logging.getLogger(__name__)
+
+
+class JsonErrorMiddleware(MiddlewareMixin):
+    """Turns exceptions raised by `json_post` views into JSON error responses."""
+
+    def process_exception(self, request, exception):
+        view = getattr(request.resolver_match, "func", None)
+        if not getattr(view, "json_errors", False):
+            return None  # not an API view; leave it to Django's usual handling
+        if isinstance(exception, json.JSONDecodeError):
+            return error_response(ERR_BAD_JSON, status=400)
+        if isinstance(exception, FileNotFoundError):
+            return json_response({
+                "error": f"A required data file was not found: {exception.filename}. "
+                         "Please ensure it is in the agent/data/ directory."
+            }, status=404)
+        # Async views reach this hook through sync_to_async, in a thread where
+        # sys.exc_info() is empty, so the traceback is taken from the exception itself.
+        logger.error("%s failed", request.path, exc_info=exception)
+        return error_response(ERR_INTERNAL, status=500)
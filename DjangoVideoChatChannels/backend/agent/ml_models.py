@@ -0,0 +1,202 @@
+# agent/ml_models.py
+"""
+Process-wide model singletons for the interview agent.
+
+Each model is loaded on first use and then shared by every caller in the worker,
+so importing the agent (or any Django module that imports it) does not pay the
+load cost up front, and no model is ever loaded twice in one process. The ML
+libraries themselves are imported inside the loaders for the same reason.
+"""
+
+from __future__ import annotations
+
+import os
+import functools
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+import numpy as np
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    import google.generativeai as genai
+    import spacy
+    import torch
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+
+load_dotenv()
+os.environ["TOKENIZERS_PARALLELISM"] = "false"
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# --- Embedding Model ---
+# The sentence encoder runs through ONNX Runtime. The INT8 graph is produced once at
+# build time (see README); if it is missing we export the FP32 graph from the hub instead.
+EMBEDDER_MODEL_ID = "sentence-transformers/all-mpnet-base-v2"
+EMBEDDER_ONNX_DIR = os.path.join(SCRIPT_DIR, "onnx_mpnet")
+EMBEDDER_QUANTIZED_DIR = os.path.join(EMBEDDER_ONNX_DIR, "quantized")
+EMBEDDER_FP16_DIR = os.path.join(EMBEDDER_ONNX_DIR, "fp16")
+# Each server worker gets its own copy of the model. By default the cores are split
+# evenly across GUNICORN_WORKERS so every worker uses its share without oversubscribing.
+_WORKERS = max(1, int(os.getenv("GUNICORN_WORKERS", "1")))
+EMBEDDER_THREADS = int(os.getenv("EMBEDDER_THREADS", "0")) or max(1, (os.cpu_count() or 1) // _WORKERS)
+
+GEMINI_MODEL_NAME = "gemini-1.5-flash"
+# gRPC (the default) multiplexes every call over one long-lived HTTP/2 channel per client;
+# "rest" is available for networks that block it.
+GEMINI_TRANSPORT = os.getenv("GEMINI_TRANSPORT", "grpc")
+
+
+def _load_once(loader):
+    """Caches `loader`'s result; concurrent first calls wait for a single load."""
+    cached = functools.lru_cache(maxsize=1)(loader)
+    lock = threading.Lock()
+
+    @functools.wraps(loader)
+    def getter():
+        with lock:
+            return cached()
+    return getter
+
+
+class SentenceEncoder:
+    """ONNX sentence encoder: tokenize, run the session, mean-pool and L2-normalize."""
+
+    def __init__(self, model: ORTModelForFeatureExtraction, tokenizer: AutoTokenizer):
+        self.model = model
+        self.tokenizer = tokenizer
+
+    @staticmethod
+    def _mean_pooling(token_embeddings: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        """Averages token embeddings, ignoring padding positions."""
+        import torch
+
+        input_mask_expanded = attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
+        return torch.sum(token_embeddings * input_mask_expanded, 1) / torch.clamp(input_mask_expanded.sum(1), min=1e-9)
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """Encodes texts into L2-normalized sentence embeddings, one float32 row per text."""
+        import torch
+
+        encoded = self.tokenizer(texts, padding=True, truncation=True, return_tensors="pt").to(self.model.device)
+        with torch.no_grad():
+            model_output = self.model(**encoded)
+            # Pool and normalize on the model's device; only the final vectors are copied back.
+            embeddings = torch.nn.functional.normalize(
+                self._mean_pooling(model_output[0], encoded["attention_mask"]), p=2, dim=1
+            )
+        return embeddings.float().cpu().numpy()
+
+
+def load_embedder() -> SentenceEncoder:
+    """Loads the quantized ONNX sentence encoder and its tokenizer, and warms it up."""
+    import onnxruntime as ort
+    import torch
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+
+    torch.set_num_threads(EMBEDDER_THREADS)
+    torch.set_num_interop_threads(1)
+    session_options = ort.SessionOptions()
+    session_options.intra_op_num_threads = EMBEDDER_THREADS
+    session_options.inter_op_num_threads = 1
+    # Constant folding plus layer/attention fusion on whatever graph is loaded.
+    session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+    tokenizer = AutoTokenizer.from_pretrained(EMBEDDER_MODEL_ID)
+    # INT8 dynamic quantization is a CPU optimisation; on a GPU host the FP16 export is used.
+    on_cuda = "CUDAExecutionProvider" in ort.get_available_providers()
+    provider = "CUDAExecutionProvider" if on_cuda else "CPUExecutionProvider"
+    if on_cuda and os.path.exists(os.path.join(EMBEDDER_FP16_DIR, "model.onnx")):
+        # FP16 halves memory traffic and runs the matmuls on tensor cores; IO binding keeps
+        # inputs and outputs on the device instead of round-tripping them through host memory.
+        source, kwargs = EMBEDDER_FP16_DIR, {"use_io_binding": True}
+    elif on_cuda:
+        logger.warning("CUDA is available but no FP16 export was found in %s; using FP32.", EMBEDDER_FP16_DIR)
+        source, kwargs = EMBEDDER_MODEL_ID, {"export": True, "use_io_binding": True}
+    elif os.path.exists(os.path.join(EMBEDDER_QUANTIZED_DIR, "model_quantized.onnx")):
+        source, kwargs = EMBEDDER_QUANTIZED_DIR, {"file_name": "model_quantized.onnx"}
+    else:
+        source, kwargs = EMBEDDER_MODEL_ID, {"export": True}
+    model = ORTModelForFeatureExtraction.from_pretrained(
+        source, provider=provider, session_options=session_options, **kwargs
+    )
+    encoder = SentenceEncoder(model, tokenizer)
+    # Pay allocator/graph initialisation cost once, at load, rather than on a later request.
+    encoder.encode(["warmup"])
+    return encoder
+
+
+@_load_once
+def get_embedder() -> SentenceEncoder | None:
+    """Returns the shared sentence encoder, or None if it could not be loaded."""
+    try:
+        return load_embedder()
+    except Exception:
+        logger.exception("Could not load the embedding model; similarity features are disabled.")
+        return None
+
+
+@_load_once
+def _configure_gemini() -> bool:
+    """Configures the Gemini client once per process; False if that failed."""
+    try:
+        import google.generativeai as genai
+
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"), transport=GEMINI_TRANSPORT)
+        return True
+    except Exception:
+        logger.exception("Could not configure Gemini; LLM features are disabled.")
+        return False
+
+
+def preconnect_gemini():
+    """
+    Opens the Gemini channel (DNS, TCP, TLS) with a cheap metadata call, so the first
+    interview turn doesn't pay for the handshake; the channel is reused afterwards.
+    Only called from the warmup thread: it blocks on the network, and it runs outside
+    the configure lock, so callers of `get_gemini` on the event loop never wait for it.
+    """
+    if not _configure_gemini():
+        return
+    import google.generativeai as genai
+
+    try:
+        genai.get_model(f"models/{GEMINI_MODEL_NAME}")
+    except Exception as e:
+        logger.warning("Could not pre-connect to Gemini: %s", e)
+
+
+@functools.lru_cache(maxsize=16)
+def get_gemini(system_instruction: str = "") -> genai.GenerativeModel | None:
+    """
+    Returns the shared Gemini model for `system_instruction`, or None if Gemini could
+    not be configured. Each tool has a fixed system prompt, so there is one model per
+    tool; they all share the configured client and its channel.
+    """
+    if not _configure_gemini():
+        return None
+    import google.generativeai as genai
+
+    return genai.GenerativeModel(GEMINI_MODEL_NAME, system_instruction=system_instruction or None)
+
+
+@_load_once
+def get_nlp() -> spacy.language.Language | None:
+    """Returns the shared spaCy pipeline, or None if it could not be loaded."""
+    try:
+        import spacy
+
+        # Only the tokenizer and NER are used. `exclude` (unlike `disable`) also skips
+        # loading the other components' weights, so they cost neither memory nor time.
+        nlp = spacy.load("en_core_web_sm", exclude=["parser", "tagger", "attribute_ruler", "lemmatizer"])
+        if nlp.pipe_names != ["tok2vec", "ner"]:
+            logger.warning("Unexpected spaCy pipeline %s; expected ['tok2vec', 'ner'].", nlp.pipe_names)
+        nlp("warmup")
+        return nlp
+    except Exception:
+        logger.exception("Could not load spaCy; NER name extraction is disabled.")
+        return None
@@ -0,0 +1,80 @@
+# agent/response_cache.py
+"""
+Replays the response to a repeated turn request instead of running the turn again.
+
+A retried or duplicated POST (a flaky network, a reconnect) repeats the session id and
+the client's turn counter of the original, so together with the response's media type
+they identify the response that was already produced. Requests without a turn counter
+are never cached: two real turns can carry the same answer (a repeated "yes", or two
+silent replies), and only the counter tells them apart from a resend. First turns are
+never cached either, since they have no session yet. The cache is per process and bounded.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+from django.http import HttpResponse, HttpResponseNotModified
+
+try:
+    from xxhash import xxh3_64_hexdigest as _digest
+except ImportError:
+    def _digest(data: bytes) -> str:
+        return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+RESPONSE_CACHE_SIZE = 256
+
+
+class ResponseCache:
+    """Size-bounded LRU of response bytes and their content type, keyed by `key`."""
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[bytes, str]] = OrderedDict()
+
+    @staticmethod
+    def key(session_id: str, turn: int, media_type: str) -> str:
+        """Identifies one response; also used as its ETag."""
+        return _digest(f"{session_id}\0{turn}\0{media_type}".encode())
+
+    def key_for(self, data: dict, media_type: str) -> str | None:
+        """
+        The key for a decoded turn request, or None if its response must not be replayed:
+        a first turn, or one without an integer `turn` counter.
+        """
+        session_id, turn = data.get("sessionId"), data.get("turn")
+        if session_id is None or not isinstance(turn, int) or isinstance(turn, bool):
+            return None
+        return self.key(str(session_id), turn, media_type)
+
+    def get(self, key: str) -> tuple[bytes, str] | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, payload: bytes, content_type: str):
+        self._entries[key] = (payload, content_type)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def replay(self, request, key: str) -> HttpResponse | None:
+        """
+        The cached response for `key` (304 if the client already holds it, per
+        If-None-Match), or None on a miss.
+        """
+        entry = self.get(key)
+        if entry is None:
+            return None
+        payload, content_type = entry
+        etag = f'"{key}"'
+        if request.headers.get("If-None-Match") == etag:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(payload, content_type=content_type)
+        response["ETag"] = etag
+        return response
+
+
+# Shared by both turn views.
+response_cache = ResponseCache()
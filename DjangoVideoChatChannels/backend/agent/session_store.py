@@ -0,0 +1,131 @@
+# agent/session_store.py
+"""
+Server-side storage for interview state between turns.
+
+With REDIS_URL set (and the `redis` package installed) sessions live in Redis, so
+any worker can serve any turn of any interview. Otherwise they are kept in this
+process's memory as plain dicts, so a turn pays no serialization at all. Either
+way a session expires SESSION_TTL seconds after its last turn, so abandoned
+interviews don't accumulate.
+
+In Redis the state is stored as msgpack when that package is installed (it packs and
+unpacks the state faster than JSON and smaller), otherwise as JSON. Both are read
+back, so switching formats doesn't strand sessions already stored.
+"""
+
+import os
+import time
+import logging
+import uuid
+import asyncio
+import weakref
+from collections import OrderedDict
+
+from .json_utils import dumps, loads, msgpack, packb, unpackb
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+SESSION_TTL = int(os.getenv("SESSION_TTL", "1800"))
+logger = logging.getLogger(__name__)
+
+SESSION_KEY_PREFIX = "interview:"
+# Upper bound on one turn (a few LLM calls). A Redis lock held longer is assumed abandoned.
+SESSION_LOCK_TIMEOUT = 120
+
+
+def _encode_state(state: dict) -> bytes:
+    return packb(state) if msgpack else dumps(state)
+
+
+def _decode_state(raw: bytes) -> dict:
+    # A JSON object always starts with "{"; a packed dict never does.
+    return loads(raw) if raw[:1] == b"{" or not msgpack else unpackb(raw)
+
+
+class SessionStore:
+    """Keeps each interview's state under its session id, with a sliding TTL."""
+
+    def __init__(self, redis_url: str | None = None, ttl: int = SESSION_TTL):
+        self.ttl = ttl
+        self._redis = redis.from_url(redis_url) if redis_url and redis else None
+        if redis_url and not redis:
+            logger.warning("REDIS_URL is set but the redis package is not installed; sessions are kept in memory.")
+        # key -> (expiry, state), oldest write first so expired entries are purged from the front.
+        self._local: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        # One lock per session with a turn in progress; entries vanish once no turn holds them.
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def _purge_expired(self, now: float):
+        while self._local:
+            key, (expires, _) = next(iter(self._local.items()))
+            if expires > now:
+                break
+            del self._local[key]
+
+    def lock(self, session_id: str):
+        """
+        Async context manager serializing the turns of one interview, so a duplicate or
+        retried request can't interleave with the original. Different interviews never
+        contend. With Redis the lock is shared by all workers.
+        """
+        if self._redis:
+            return self._redis.lock(SESSION_KEY_PREFIX + session_id + ":lock", timeout=SESSION_LOCK_TIMEOUT)
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        return lock
+
+    async def get(self, session_id: str) -> dict | None:
+        """Returns the stored state, or None if the session is unknown or has expired."""
+        key = SESSION_KEY_PREFIX + session_id
+        if self._redis:
+            raw = await self._redis.get(key)
+            return _decode_state(raw) if raw is not None else None
+        self._purge_expired(time.monotonic())
+        state = self._local.get(key, (0.0, None))[1]
+        # A shallow copy, so a turn that fails halfway leaves the stored state untouched.
+        # Nodes return new lists rather than appending, so nothing deeper is shared-mutated.
+        return dict(state) if state is not None else None
+
+    async def exists(self, session_id: str) -> bool:
+        """True if the session is known and unexpired, without loading its state."""
+        key = SESSION_KEY_PREFIX + session_id
+        if self._redis:
+            return bool(await self._redis.exists(key))
+        self._purge_expired(time.monotonic())
+        return key in self._local
+
+    async def set(self, session_id: str, state: dict):
+        key = SESSION_KEY_PREFIX + session_id
+        if self._redis:
+            await self._redis.set(key, _encode_state(state), ex=self.ttl)
+        else:
+            self._local[key] = (time.monotonic() + self.ttl, state)
+            self._local.move_to_end(key)
+
+    async def delete(self, session_id: str):
+        key = SESSION_KEY_PREFIX + session_id
+        if self._redis:
+            await self._redis.delete(key)
+        else:
+            self._local.pop(key, None)
+
+
+# Shared by every view in the process.
+session_store = SessionStore(os.getenv("REDIS_URL"))
+
+
+# The only parts of the state the client renders. Everything else (JD, resume, the
+# growing interview log) stays server-side, so a turn's payload doesn't grow with the session.
+CLIENT_FIELDS = ("reply_to_user", "question_for_user", "current_stage")
+
+def client_payload(state: dict, session_id: str) -> dict:
+    """The response body for one turn: the visible fields plus the session id."""
+    return {"session_id": session_id, **{k: state.get(k, "") for k in CLIENT_FIELDS}}
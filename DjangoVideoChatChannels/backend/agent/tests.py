@@ -1,3 +1,196 @@
-from django.test import TestCase
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
-# Create your tests here.
+from django.test import RequestFactory, SimpleTestCase
+
+from . import agent
+from .agent import Evaluator, extract_name
+from .json_utils import ERR_BAD_JSON, ERR_BAD_METHOD, ERR_EMPTY_BODY, ERR_TOO_LARGE, MAX_BODY
+from .response_cache import ResponseCache
+from .session_store import SessionStore
+
+TURN_URL = "/api/agent/interview-turn/"
+
+
+# NER and the LLM are switched off so these cover the regex passes alone.
+@mock.patch("agent.agent.get_gemini", return_value=None)
+@mock.patch("agent.agent.get_nlp", return_value=None)
+class ExtractNameTests(SimpleTestCase):
+    def test_introduction_phrases(self, *_):
+        self.assertEqual(extract_name("My name is John Doe"), "John Doe")
+        self.assertEqual(extract_name("i'm Jane"), "Jane")
+        self.assertEqual(extract_name("Hi, I am fine thanks, my name is Sarah Lee"), "Sarah Lee")
+
+    def test_lowercase_name_after_my_name_is(self, *_):
+        self.assertEqual(extract_name("my name is john"), "John")
+        self.assertEqual(extract_name("call me priya sharma"), "Priya Sharma")
+        self.assertEqual(extract_name("my name is john and i work at google"), "John")
+
+    def test_lowercase_words_after_an_ambiguous_lead_in_are_not_a_name(self, *_):
+        self.assertIsNone(extract_name("I am ready"))
+        self.assertIsNone(extract_name("i'm priya sharma"))
+
+    def test_ambiguous_lead_in_goes_to_the_llm_however_short(self, get_nlp, get_gemini):
+        get_gemini.return_value = object()
+        with mock.patch("agent.agent.call_llm", return_value="Priya Sharma") as call_llm:
+            self.assertEqual(extract_name("i'm priya sharma"), "Priya Sharma")
+        call_llm.assert_called_once()
+
+    def test_sentence_openers_need_a_capitalized_name(self, *_):
+        self.assertEqual(extract_name("This is Sam"), "Sam")
+        self.assertEqual(extract_name("Myself Priya"), "Priya")
+        self.assertEqual(extract_name("This is really exciting, I am Priya"), "Priya")
+        self.assertIsNone(extract_name("this is really exciting"))
+
+    def test_bare_name(self, *_):
+        self.assertEqual(extract_name("John Smith"), "John Smith")
+        self.assertEqual(extract_name("O'Neil"), "O'Neil")
+
+
+class JdSummaryCacheTests(SimpleTestCase):
+    def setUp(self):
+        agent._summarize_job_description_cached.cache_clear()
+        self.addCleanup(agent._summarize_job_description_cached.cache_clear)
+        cache_dir = tempfile.mkdtemp()
+        for name, value in (("CACHE_DIR", cache_dir),
+                            ("JD_SUMMARY_CACHE_PATH", os.path.join(cache_dir, "jd_summaries.json"))):
+            patcher = mock.patch.object(agent, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @mock.patch("agent.agent._call_llm_uncached", side_effect=lambda prompt: "Summary of " + prompt[-1])
+    def test_concurrent_writes_keep_every_summary(self, _):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(agent._summarize_job_description_cached, "abcdefgh"))
+        self.assertEqual(len(agent._load_jd_summaries()), 8)
+
+    @mock.patch("agent.agent._call_llm_uncached", return_value="A friendly summary.")
+    def test_summary_is_returned_when_it_cannot_be_persisted(self, _):
+        with mock.patch("agent.agent.tempfile.mkstemp", side_effect=PermissionError("read-only")):
+            self.assertEqual(agent._summarize_job_description_cached("Some JD"), "A friendly summary.")
+
+
+class ExtractJsonTests(SimpleTestCase):
+    def setUp(self):
+        self.evaluator = Evaluator()
+
+    def test_bare_object(self):
+        self.assertEqual(self.evaluator._extract_json('{"clarity": 7, "feedback": "Good."}'),
+                         {"clarity": 7, "feedback": "Good."})
+
+    def test_fenced_object_with_surrounding_text(self):
+        text = 'Here you go:\n```json\n{"depth": 6}\n```\nHope that helps.'
+        self.assertEqual(self.evaluator._extract_json(text), {"depth": 6})
+
+    def test_object_followed_by_text(self):
+        self.assertEqual(self.evaluator._extract_json('Scores: {"relevance": 9} (out of 10)'), {"relevance": 9})
+
+    def test_no_object(self):
+        self.assertEqual(self.evaluator._extract_json("There was an error."), {})
+        self.assertEqual(self.evaluator._extract_json("{not json"), {})
+
+
+class JsonPostTests(SimpleTestCase):
+    def test_other_methods_are_rejected(self):
+        response = self.client.get(TURN_URL)
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response.content, ERR_BAD_METHOD)
+        self.assertEqual(response["Allow"], "POST")
+
+    def test_empty_body(self):
+        response = self.client.post(TURN_URL, data=b"", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.content, ERR_EMPTY_BODY)
+
+    def test_oversized_body(self):
+        response = self.client.post(TURN_URL, data=b" " * (MAX_BODY + 1), content_type="application/json")
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.content, ERR_TOO_LARGE)
+
+    def test_malformed_body_is_a_json_400_whatever_the_content_type(self):
+        for content_type in ("application/json", "application/x-www-form-urlencoded"):
+            response = self.client.post(TURN_URL, data=b"not json", content_type=content_type)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.content, ERR_BAD_JSON)
+
+
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = ResponseCache(maxsize=2)
+        self.factory = RequestFactory()
+
+    def test_only_numbered_subsequent_turns_are_keyed(self):
+        self.assertIsNone(self.cache.key_for({"sessionId": None, "turn": 0}, "application/json"))
+        self.assertIsNone(self.cache.key_for({"sessionId": "abc"}, "application/json"))
+        self.assertIsNone(self.cache.key_for({"sessionId": "abc", "turn": True}, "application/json"))
+        key = self.cache.key_for({"sessionId": "abc", "turn": 3}, "application/json")
+        self.assertEqual(key, self.cache.key("abc", 3, "application/json"))
+        self.assertNotEqual(key, self.cache.key("abc", 3, "application/msgpack"))
+        self.assertNotEqual(key, self.cache.key("abc", 4, "application/json"))
+
+    def test_replay(self):
+        key = self.cache.key("abc", 1, "application/json")
+        self.assertIsNone(self.cache.replay(self.factory.post("/"), key))
+        self.cache.put(key, b'{"ok":true}', "application/json")
+        response = self.cache.replay(self.factory.post("/"), key)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'{"ok":true}')
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response["ETag"], f'"{key}"')
+
+    def test_matching_if_none_match_is_a_304(self):
+        key = self.cache.key("abc", 1, "application/json")
+        self.cache.put(key, b'{"ok":true}', "application/json")
+        response = self.cache.replay(self.factory.post("/", headers={"If-None-Match": f'"{key}"'}), key)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_least_recently_used_entry_is_evicted(self):
+        first, second, third = (self.cache.key("abc", turn, "application/json") for turn in (1, 2, 3))
+        self.cache.put(first, b"1", "application/json")
+        self.cache.put(second, b"2", "application/json")
+        self.cache.get(first)
+        self.cache.put(third, b"3", "application/json")
+        self.assertIsNone(self.cache.get(second))
+        self.assertIsNotNone(self.cache.get(first))
+
+
+class InMemorySessionStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.store = SessionStore()
+
+    async def test_set_get_delete(self):
+        session_id = self.store.new_id()
+        self.assertIsNone(await self.store.get(session_id))
+        self.assertFalse(await self.store.exists(session_id))
+        await self.store.set(session_id, {"current_stage": "awaiting_answer"})
+        self.assertTrue(await self.store.exists(session_id))
+        self.assertEqual(await self.store.get(session_id), {"current_stage": "awaiting_answer"})
+        await self.store.delete(session_id)
+        self.assertIsNone(await self.store.get(session_id))
+
+    async def test_get_returns_a_copy(self):
+        await self.store.set("abc", {"user_input": "first"})
+        (await self.store.get("abc"))["user_input"] = "changed"
+        self.assertEqual((await self.store.get("abc"))["user_input"], "first")
+
+    async def test_sessions_expire(self):
+        store = SessionStore(ttl=0)
+        await store.set("abc", {})
+        self.assertIsNone(await store.get("abc"))
+
+    async def test_lock_serializes_turns_of_one_session(self):
+        order = []
+
+        async def turn(name):
+            async with self.store.lock("abc"):
+                order.append(f"{name} start")
+                await asyncio.sleep(0.01)
+                order.append(f"{name} end")
+
+        await asyncio.gather(turn("a"), turn("b"))
+        self.assertEqual(order, ["a start", "a end", "b start", "b end"])
+        self.assertIsNot(self.store.lock("abc"), self.store.lock("other"))
@@ -1,26 +1,70 @@
-import json
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
-from django.views.decorators.csrf import csrf_exempt
+# agent/views.py
+"""
+The interview turn endpoints: `interview_turn`, the JSON API, answers each turn with
+one response; `handle_interview_turn`, used by the interview page, streams it as NDJSON.
+Both share the session handling below.
+"""
+
+import asyncio
+import logging
+
+from django.http import StreamingHttpResponse
 
 # Import the agent system and utility functions from your agent.py file
 # The '.' indicates a relative import from the same app directory.
-from .agent import AgenticInterviewSystem, read_file
+from .agent import demo_documents, get_agent_system, load_demo_documents, read_file
+from .response_cache import response_cache
+from .json_utils import (
+    ERR_INTERNAL, ERR_NO_SESSION, dumps, error_response, json_post, negotiated_response, response_media_type
+)
+from .session_store import CLIENT_FIELDS, client_payload, session_store
+
+logger = logging.getLogger(__name__)
+
+_ERR_MISSING_FILES = dumps({'error': '`jobDescriptionFile` and `resumeFile` are required for the first call.'})
 
 # --- Agent Initialization ---
-# Instantiate the agent system once when the Django server starts.
-# The agent itself is stateless; the interview's state is passed in with each API call.
-agent_system = AgenticInterviewSystem()
+# One agent per process, built on first use (or by the warmup in AgentConfig.ready).
+# The agent itself is stateless; each interview's state lives in the session store.
 
-@csrf_exempt
-@require_POST
-def interview_turn(request):
+def _initial_state(job_description: str, resume: str, num_questions: int, user_input: str) -> dict:
+    """
+    The state a new interview starts from. The agent's entry router sees that
+    'current_stage' is unset and routes to the 'greeting_node'.
+    """
+    return {
+        "job_description": job_description,
+        "resume": resume,
+        "num_questions_total": num_questions,
+        "user_input": user_input,
+        "candidate_name": "",
+        "asked_questions": [],
+        "interview_logs": [],
+        "jd_summary": "",
+        "resume_chunks": [],
+        "reply_to_user": "",
+        "question_for_user": "",
+        "current_stage": None, # Agent will use this to start with a greeting
+        "_last_question_asked": "",
+        "_pending_follow_up_q": ""
+    }
+
+async def _save_turn(session_id: str, new_state: dict):
+    """Keeps the new state for the next turn; a finished interview's state is dropped."""
+    if new_state.get('current_stage') == 'done':
+        await session_store.delete(session_id)
+    else:
+        await session_store.set(session_id, new_state)
+
+@json_post
+async def interview_turn(request, data):
     """
     Handles a single turn of the AI-driven interview.
 
-    This view acts as thendpoe central API int for the interview process. It's designed
-    to be stateless on the server, relying on the client to maintain the interview's
-    state between turns.
+    This view acts as thendpoe central API int for the interview process. Between turns
+    the interview's state is kept server-side in the session store (Redis when
+    REDIS_URL is set), so any worker can serve any turn. Each response carries the
+    `session_id` the client sends back on its next turn.
 
     ## API Contract
 
@@ -39,72 +83,165 @@ def interview_turn(request):
     ```
 
     ### Subsequent Requests
-    All subsequent requests must include the full `state` object returned by the
-    previous call, along with the candidate's latest `userInput`.
+    All subsequent requests must include the `session_id` returned by the first call,
+    along with the candidate's latest `userInput`.
 
     **Body:**
     ```json
     {
-        "state": { ... full state object from previous response ... },
+        "sessionId": "3f2c9a...",
+        "turn": 1,
         "userInput": "The candidate's answer to the last question."
     }
     ```
+
+    `turn` is optional and counts the client's requests, so a resent request (same
+    session, same `turn`) is recognised as a retry: its response is replayed from
+    `agent.response_cache` (or 304 on a matching If-None-Match) instead of running
+    the turn twice. Requests without it always run the turn.
+
+    Bodies may also be sent as `application/msgpack`, and `Accept: application/msgpack`
+    gets the response packed the same way (when `msgpack` is installed).
+
+    `json_post` rejects other methods and empty or oversized bodies before decoding.
+    Malformed JSON and unexpected errors are turned into JSON error responses by
+    `agent.middleware.JsonErrorMiddleware`.
     """
-    try:
-        data = json.loads(request.body)
-        state = data.get('state')
-        user_input = data.get('userInput', '')
-
-        # --- Determine current state (initial or subsequent turn) ---
-        if state is None:
-            # This is the FIRST TURN. We initialize the state from scratch.
-            jd_file = data.get('jobDescriptionFile')
-            resume_file = data.get('resumeFile')
-            num_questions = data.get('numQuestions', 5) # Default to 5 questions
-
-            if not jd_file or not resume_file:
-                return JsonResponse({
-                    'error': '`jobDescriptionFile` and `resumeFile` are required for the first call.'
-                }, status=400)
-
-            # Prepare the initial state dictionary for the agent.
-            # The agent's entry router will see that 'current_stage' is missing
-            # and will correctly route to the 'greeting_node'.
-            current_state = {
-                "job_description": read_file(jd_file),
-                "resume": read_file(resume_file),
-                "num_questions_total": int(num_questions),
-                "user_input": user_input,
-                "candidate_name": "",
-                "asked_questions": [],
-                "interview_logs": [],
-                "reply_to_user": "",
-                "question_for_user": "",
-                "current_stage": None, # Agent will use this to start with a greeting
-                "_last_question_asked": "",
-                "_pending_follow_up_q": ""
-            }
-        else:
-            # This is a SUBSEQUENT TURN. Use the state provided by the client.
-            current_state = state
+    session_id = data.get('sessionId')
+    user_input = data.get('userInput', '')
+
+    # --- Determine current state (initial or subsequent turn) ---
+    if session_id is None:
+        # This is the FIRST TURN. We initialize the state from scratch.
+        jd_file = data.get('jobDescriptionFile')
+        resume_file = data.get('resumeFile')
+        num_questions = data.get('numQuestions', 5) # Default to 5 questions
+
+        if not jd_file or not resume_file:
+            return error_response(_ERR_MISSING_FILES, status=400)
+
+        session_id = session_store.new_id()
+        # File reads block; run them in worker threads so the event loop keeps serving other turns.
+        job_description, resume = await asyncio.gather(
+            asyncio.to_thread(read_file, jd_file), asyncio.to_thread(read_file, resume_file)
+        )
+        current_state = _initial_state(job_description, resume, int(num_questions), user_input)
+    else:
+        # This is a SUBSEQUENT TURN. The state saved after the previous turn is loaded below.
+        current_state = None
+    cache_key = response_cache.key_for(data, response_media_type(request))
+
+    # One turn at a time per interview: load, run and save under the session's lock.
+    async with session_store.lock(session_id):
+        # Checked under the lock, so a duplicate of a turn still running waits for its result.
+        if cache_key and (cached := response_cache.replay(request, cache_key)):
+            return cached
+        if current_state is None:
+            current_state = await session_store.get(session_id)
+            if current_state is None:
+                return error_response(ERR_NO_SESSION, status=404)
             current_state['user_input'] = user_input
 
         # --- Invoke Agent Logic ---
         # Pass the complete current state to the agent's invoke method.
         # The agent processes the input, updates the state, and determines the next action.
-        new_state = agent_system.invoke(current_state)
-
-        # The agent's response IS the new state. The frontend will use the
-        # 'reply_to_user' and 'question_for_user' keys to display messages
-        # and will store the entire `new_state` object for the next turn.
-        return JsonResponse(new_state)
-
-    except json.JSONDecodeError:
-        return JsonResponse({'error': 'Invalid JSON format in request body.'}, status=400)
-    except FileNotFoundError as e:
-        return JsonResponse({'error': f'A required data file was not found: {e.filename}. Ensure it exists in the agent/data/ directory.'}, status=404)
-    except Exception as e:
-        # A general error handler for any other unexpected issues.
-        # It's recommended to replace print with a proper logging setup.
-        print(f"ERROR in interview_turn: {e}")
-        return JsonResponse({'error': 'An unexpected internal server error occurred.'}, status=500)
\ No newline at end of file
+        new_state = await get_agent_system().ainvoke(current_state)
+        await _save_turn(session_id, new_state)
+
+        # Only what the frontend displays is returned ('reply_to_user', 'question_for_user',
+        # 'current_stage'); it sends 'session_id' back with the next turn.
+        response = negotiated_response(request, client_payload(new_state, session_id))
+        if cache_key:
+            response_cache.put(cache_key, response.content, response['Content-Type'])
+            response['ETag'] = f'"{cache_key}"'
+    return response
+
+async def _stream_turn(session_id, current_state, user_input, cache_key=None):
+    """
+    Runs one turn under the session's lock, yielding an NDJSON line whenever a visible
+    field changes. `current_state` is None for a subsequent turn, whose state is loaded
+    once the lock is held. A completed stream is kept under `cache_key` for replay.
+
+    The lock is taken here, not in the view, so it is only held while the server is
+    iterating the body: a response that is never sent (the client left first) holds nothing.
+    """
+    try:
+        async with session_store.lock(session_id):
+            # A duplicate of a turn that was still streaming finds the finished stream now.
+            cached = cache_key and response_cache.get(cache_key)
+            if cached:
+                yield cached[0]
+                return
+            if current_state is None:
+                current_state = await session_store.get(session_id)
+                if current_state is None:
+                    # The interview finished or expired since the view checked for it.
+                    yield ERR_NO_SESSION + b"\n"
+                    return
+                current_state['user_input'] = user_input
+
+            lines = [dumps({'session_id': session_id}) + b"\n"]
+            yield lines[-1]
+            new_state = current_state
+            async for update, new_state in get_agent_system().astream(current_state):
+                visible = {k: update[k] for k in CLIENT_FIELDS if k in update}
+                if visible:
+                    lines.append(dumps(visible) + b"\n")
+                    yield lines[-1]
+            await _save_turn(session_id, new_state)
+            if cache_key:
+                response_cache.put(cache_key, b"".join(lines), 'application/x-ndjson')
+    except Exception:
+        # The status line has already been sent, so the error travels in the stream.
+        logger.exception("handle_interview_turn failed mid-stream")
+        yield ERR_INTERNAL + b"\n"
+
+@json_post
+async def handle_interview_turn(request, data):
+    """
+    Handles a single turn of the interview.
+
+    This view loads the interview state saved under the client's session id and
+    streams the turn back as NDJSON: a first line with the session id, then one
+    line per agent step that changes what the client displays ('reply_to_user',
+    'question_for_user', 'current_stage'), so a reply can be spoken while the
+    rest of the turn is still running. The updated state is saved at the end.
+    An interview that ends between the session check and the turn reports
+    ERR_NO_SESSION as its only line.
+    `json_post` has already checked the method and body size and decoded the body.
+    Errors before streaming starts are handled by `agent.middleware.JsonErrorMiddleware`.
+    """
+    session_id = data.get('sessionId')
+    user_input = data.get('userInput', '')
+
+    # --- State Management ---
+    if session_id is None:
+        # First turn: Initialize the state for a new interview.
+        # In a real app, you might get these filenames from the request.
+        logger.info("Initializing new interview state.")
+        session_id = session_store.new_id()
+        # Read at startup by `agent.warm_up`; only a turn that beats the warmup reads them
+        # here, off the event loop.
+        job_description, resume = demo_documents() or await asyncio.to_thread(load_demo_documents)
+        current_state = _initial_state(job_description, resume, 5, user_input)
+    else:
+        # Subsequent turns: The state saved after the previous turn is loaded below.
+        current_state = None
+    # A resent subsequent turn (same session, same turn counter) replays its first response.
+    cache_key = response_cache.key_for(data, 'application/x-ndjson')
+    if cache_key and (cached := response_cache.replay(request, cache_key)):
+        return cached
+    # Unknown sessions still get a real 404. The state itself is loaded by `_stream_turn`
+    # under the session's lock, so one turn at a time runs per interview.
+    if current_state is None and not await session_store.exists(session_id):
+        return error_response(ERR_NO_SESSION, status=404)
+
+    # --- Invoke Agent Logic ---
+    response = StreamingHttpResponse(
+        _stream_turn(session_id, current_state, user_input, cache_key), content_type='application/x-ndjson'
+    )
+    response['Cache-Control'] = 'no-cache'
+    if cache_key:
+        response['ETag'] = f'"{cache_key}"'
+    response['X-Accel-Buffering'] = 'no'  # keep reverse proxies from holding lines back
+    return response
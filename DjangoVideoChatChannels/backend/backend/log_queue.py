@@ -0,0 +1,25 @@
+# backend/log_queue.py
+"""
+Off-thread logging for the `LOGGING` setting.
+
+Request handlers only enqueue records; a single listener thread formats them and
+does the actual write, so a slow stderr or log pipe never stalls a request.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+
+def queue_handler() -> logging.handlers.QueueHandler:
+    """Handler factory: returns a QueueHandler whose listener writes to stderr."""
+    log_queue = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    listener.start()
+    # Flush whatever is still queued when the process exits.
+    atexit.register(listener.stop)
+    return logging.handlers.QueueHandler(log_queue)
@@ -56,6 +56,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "agent.middleware.JsonErrorMiddleware",
 ]
 
 ROOT_URLCONF = "backend.urls"
@@ -153,3 +154,20 @@ USE_TZ = True
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+# App loggers hand records to a queue; one background thread writes them out.
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "queue": {"()": "backend.log_queue.queue_handler"},
+    },
+    "loggers": {
+        "agent": {"handlers": ["queue"], "level": "INFO", "propagate": False},
+        "interview": {"handlers": ["queue"], "level": "INFO", "propagate": False},
+    },
+}
+
@@ -1,6 +1,7 @@
-import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 
+from agent.json_utils import loads
+
 class SignalingConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.room_name = "interview_room"
@@ -13,7 +14,7 @@ class SignalingConsumer(AsyncWebsocketConsumer):
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
 
     async def receive(self, text_data):
-        data = json.loads(text_data)
+        data = loads(text_data)
 
         # Ignore ping messages (used for keeping the WebSocket alive)
         if data.get("type") == "ping":
@@ -23,10 +24,11 @@ class SignalingConsumer(AsyncWebsocketConsumer):
             self.room_group_name,
             {
                 "type": "signal_message",
-                "message": data
+                # Relay the client's JSON text as-is; re-encoding the parsed dict for every
+                # peer in the room would reproduce the same string each time.
+                "text": text_data
             }
         )
 
     async def signal_message(self, event):
-        message = event["message"]
-        await self.send(text_data=json.dumps(message))
+        await self.send(text_data=event["text"])
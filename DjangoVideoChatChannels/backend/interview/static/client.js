@@ -16,6 +16,7 @@ let isAgentSpeaking = false;      // prevent echo send silence while agent speak
 let isAgentThinking = false;      // send silence while agent thinks
 let isWaitingForUserResponse = false; // NEW: track if we're waiting for user input
 let interviewState = null;        // server-synchronized interview FSM state
+let turnCounter = 0;              // numbers each turn request, so the server can tell a resend from a new turn
 
 let localStream, peerConnection;
 let username = "";
@@ -187,6 +188,21 @@ function commitUserTurn() {
 /********************
  * BACKEND TURN API  *
  ********************/
+function applyTurnUpdate(update) {
+  if (update.error) throw new Error(update.error);
+  Object.assign(interviewState, update);
+
+  // Queue agent messages - they will be spoken in order
+  if (update.reply_to_user) {
+    console.log("💬 Agent reply:", update.reply_to_user);
+    enqueueAgentMessage(update.reply_to_user);
+  }
+  if (update.question_for_user) {
+    console.log("❓ Agent question:", update.question_for_user);
+    enqueueAgentMessage(update.question_for_user);
+  }
+}
+
 async function fetchAgentResponse(text) {
   console.log("🤖 Getting agent response for:", text || "[empty]");
   setAgentThinking(true);
@@ -195,7 +211,11 @@ async function fetchAgentResponse(text) {
     const response = await fetch("/turn/", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ state: interviewState, userInput: text }),
+      body: JSON.stringify({
+        sessionId: interviewState ? interviewState.session_id : null,
+        turn: turnCounter++,
+        userInput: text,
+      }),
       credentials: "same-origin",
     });
 
@@ -205,34 +225,32 @@ async function fetchAgentResponse(text) {
       throw new Error(`HTTP error! Status: ${response.status}`);
     }
 
-    interviewState = await response.json();
-
-    const agentReply = interviewState.reply_to_user;
-    const agentQuestion = interviewState.question_for_user;
-
-    // Queue agent messages - they will be spoken in order
-    if (agentReply) {
-      console.log("💬 Agent reply:", agentReply);
-      enqueueAgentMessage(agentReply);
+    // The turn arrives as NDJSON: one object per line, each holding the fields that
+    // changed. Messages are queued as soon as their line arrives.
+    interviewState = interviewState || {};
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let pending = "";
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      pending += decoder.decode(value, { stream: true });
+      let newline;
+      while ((newline = pending.indexOf("\n")) >= 0) {
+        const line = pending.slice(0, newline).trim();
+        pending = pending.slice(newline + 1);
+        if (line) applyTurnUpdate(JSON.parse(line));
+      }
     }
 
     // Check if interview is done
     if (interviewState.current_stage === 'done') {
       console.log("🏁 Interview has concluded.");
-      if (agentQuestion) {
-        enqueueAgentMessage(agentQuestion);
-      }
       // Stop transcription and disable controls
       stopTranscription();
       return;
     }
 
-    // Queue the next question
-    if (agentQuestion) {
-      console.log("❓ Agent question:", agentQuestion);
-      enqueueAgentMessage(agentQuestion);
-    }
-
   } catch (err) {
     console.error("⚠️ Failed to get agent response:", err);
     enqueueAgentMessage("I seem to have encountered a connection issue. Let's try that again.");
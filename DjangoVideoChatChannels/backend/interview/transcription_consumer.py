@@ -2,6 +2,7 @@ import asyncio
 import json
 import threading
 import queue
+import warnings
 from urllib.parse import parse_qs
 
 from channels.generic.websocket import AsyncWebsocketConsumer
@@ -9,12 +10,28 @@ from channels.layers import get_channel_layer
 from google.cloud import speech_v1p1beta1 as speech
 from google.oauth2 import service_account
 
+# audioop is in the standard library until Python 3.13 (deprecated from 3.11).
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    try:
+        import audioop
+    except ImportError:
+        audioop = None
+
+# The browser streams 16-bit mono PCM at its AudioContext rate.
+INPUT_SAMPLE_RATE = 44100
+# Speech recognition runs at 16 kHz, so resampling first cuts the upload ~2.75x at no
+# loss for speech. Without audioop the audio is sent at the input rate.
+STT_SAMPLE_RATE = 16000 if audioop else INPUT_SAMPLE_RATE
+# Google recommends about 100 ms of audio per streaming request.
+STT_FRAME_BYTES = STT_SAMPLE_RATE * 2 // 10
 
 
 class TranscriptionConsumer(AsyncWebsocketConsumer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.audio_queue = asyncio.Queue()
+        # Audio frames go straight from `receive` to the recognizer thread; Queue.put is
+        # thread-safe and never blocks on an unbounded queue.
         self.buffer = queue.Queue()
         self.stop_event = threading.Event()
         self.username = "Anonymous"
@@ -28,10 +45,11 @@ class TranscriptionConsumer(AsyncWebsocketConsumer):
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
 
-        self.loop = asyncio.get_event_loop()  # ✅ FIX HERE
         print(f"✅ WebSocket connected for user: {self.username}")
 
-        self.transcription_task = asyncio.create_task(self.handle_audio())
+        # The recognizer thread hands transcripts back to this consumer's loop.
+        self.loop = asyncio.get_running_loop()
+
         self.thread = threading.Thread(target=self.start_transcription)
         self.thread.start()
 
@@ -40,19 +58,10 @@ class TranscriptionConsumer(AsyncWebsocketConsumer):
         print(f"🔌 WebSocket disconnected: {self.username}")
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
         self.stop_event.set()
-        self.transcription_task.cancel()
 
     async def receive(self, text_data=None, bytes_data=None):
         if bytes_data:
-            await self.audio_queue.put(bytes_data)
-
-    async def handle_audio(self):
-        while not self.stop_event.is_set():
-            try:
-                data = await self.audio_queue.get()
-                self.buffer.put(data)
-            except Exception as e:
-                print("❌ Audio handling error:", e)
+            self.buffer.put(bytes_data)
 
     def start_transcription(self):
         credentials = service_account.Credentials.from_service_account_file("key.json")
@@ -60,7 +69,7 @@ class TranscriptionConsumer(AsyncWebsocketConsumer):
 
         config = speech.RecognitionConfig(
             encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-            sample_rate_hertz=44100,
+            sample_rate_hertz=STT_SAMPLE_RATE,
             language_code="en-US",
             enable_automatic_punctuation=True,
         )
@@ -72,12 +81,25 @@ class TranscriptionConsumer(AsyncWebsocketConsumer):
         )
 
         def request_generator():
+            frame = bytearray()
+            resample_state = None
             while not self.stop_event.is_set():
                 try:
                     chunk = self.buffer.get(timeout=1)
-                    yield speech.StreamingRecognizeRequest(audio_content=chunk)
                 except queue.Empty:
+                    # Audio paused: flush the partial frame rather than holding it back.
+                    if frame:
+                        yield speech.StreamingRecognizeRequest(audio_content=bytes(frame))
+                        frame.clear()
                     continue
+                if audioop:
+                    chunk, resample_state = audioop.ratecv(
+                        chunk, 2, 1, INPUT_SAMPLE_RATE, STT_SAMPLE_RATE, resample_state
+                    )
+                frame += chunk
+                if len(frame) >= STT_FRAME_BYTES:
+                    yield speech.StreamingRecognizeRequest(audio_content=bytes(frame))
+                    frame.clear()
 
         print(f"🎙️ Starting transcription for {self.username}")
         try:
@@ -95,24 +117,25 @@ class TranscriptionConsumer(AsyncWebsocketConsumer):
                         if transcript and transcript != last_final_transcript:
                             last_final_transcript = transcript
                             print("📝 FINAL:", transcript)
-                            asyncio.run_coroutine_threadsafe(self.send_transcript(transcript), self.loop)
+                            # The channel layer is bound to the consumer's loop, so the send is
+                            # scheduled there; that also wakes the loop while no audio arrives.
+                            asyncio.run_coroutine_threadsafe(
+                                self.channel_layer.group_send(
+                                    self.room_group_name,
+                                    {
+                                        "type": "broadcast_transcript",
+                                        "text": transcript,
+                                        "sender": self.username
+                                    }
+                                ),
+                                self.loop,
+                            )
 
 
 
         except Exception as e:
             print("❌ Transcription error:", e)
 
-    async def send_transcript(self, text):
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                "type": "broadcast_transcript",
-                "text": text,
-                "sender": self.username
-                
-            }
-        )
-
     async def broadcast_transcript(self, event):
         await self.send(text_data=json.dumps({
             "type": "transcript",
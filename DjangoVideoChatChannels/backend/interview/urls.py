@@ -1,13 +1,14 @@
 # interview/urls.py
 
 from django.urls import path
+from agent import views as agent_views
 from . import views
 
 urlpatterns = [
     # Serves the main HTML page for the interview interface
     path('', views.index, name='index'),
 
-    # A single, unified endpoint to handle every turn of the conversation.
-    # This replaces the separate start_interview and send_answer endpoints.
-    path('turn/', views.handle_interview_turn, name='handle_interview_turn'),
+    # A single, unified endpoint to handle every turn of the conversation, streamed
+    # as NDJSON. It lives with the JSON API's turn view in agent/views.py.
+    path('turn/', agent_views.handle_interview_turn, name='handle_interview_turn'),
 ]
\ No newline at end of file